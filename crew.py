@@ -2,54 +2,102 @@
 
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai.tools import BaseTool  # import CrewAI's BaseTool
 from crewai_tools import FileWriterTool  # Import FileWriterTool
-from langchain_experimental.utilities import PythonREPL
-from pydantic import PrivateAttr
+from tools import get_batch_completion_tool, get_repl_tool
+import asyncio
+import copy
+import functools
+import logging
+import logging.handlers
+import queue
 import yaml
 import os
+from collections import OrderedDict
 
-# Optionally load environment variables
+# Optionally load environment variables (before anything below reads them)
 from dotenv import load_dotenv
 load_dotenv()
 
-# ---------------------------
-# Custom Tool: Python REPL
-# ---------------------------
-
-
-class PythonREPLCrewTool(BaseTool):
-    name: str = "python_repl"
-    description: str = (
-        "A Python REPL tool. Use this to execute Python code. "
-        "Make sure to use print(...) to produce output."
+# Verbose agent/crew output is opt-in: synchronous prints on every tool
+# call serialize parallel runs on a shared stdout pipe
+_VERBOSE = bool(int(os.getenv("CREW_VERBOSE", "0")))
+
+# Remaining diagnostics are handed to a background listener thread via a
+# queue, so agent threads never block on log I/O
+_log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+logger = logging.getLogger("auto_analytics")
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, logging.StreamHandler())
+_log_listener.start()
+
+# Parsed-YAML cache keyed by absolute path, storing (st_mtime, st_size, parsed).
+# Ordered so the least recently used entry can be evicted once the cap is hit.
+_YAML_CACHE: "OrderedDict[str, tuple[float, int, dict]]" = OrderedDict()
+_YAML_CACHE_MAX = 100
+
+# Prefer the libyaml-backed loader (5-10x faster); fall back to pure Python
+# when PyYAML was built without the C extension
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _load_yaml_cached(path: str) -> dict:
+    """
+    Parse a YAML file, reusing the cached result while the file is unchanged.
+
+    YAML parsing dominates crew startup, and main.run() builds a fresh
+    AnalyticsCrew per invocation, so the parse is memoized and validated
+    against the file's mtime and size. A deep copy is returned on every
+    hit so callers can mutate their config freely.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    cached = _YAML_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime and cached[1] == st.st_size:
+        _YAML_CACHE.move_to_end(path)
+        return copy.deepcopy(cached[2])
+
+    with open(path, "r") as f:
+        parsed = yaml.load(f, Loader=_YAML_LOADER)
+
+    _YAML_CACHE[path] = (st.st_mtime, st.st_size, parsed)
+    _YAML_CACHE.move_to_end(path)
+    while len(_YAML_CACHE) > _YAML_CACHE_MAX:
+        _YAML_CACHE.popitem(last=False)
+    return copy.deepcopy(parsed)
+
+
+# Cap on concurrently executing agent tasks during a fan-out phase
+MAX_PARALLEL_AGENTS = 3
+
+
+async def run_parallel_phase(tasks):
+    """
+    Execute a list of independent Task objects concurrently.
+
+    Tasks with no context dependency on each other can fan out here so
+    wall-clock time is bounded by the slowest task instead of the sum of
+    all task latencies. Concurrency is capped by MAX_PARALLEL_AGENTS and
+    failures are returned in-place rather than cancelling siblings.
+    """
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_AGENTS)
+
+    async def run_with_limit(t):
+        async with semaphore:
+            # Task execution is blocking, so push it onto a worker thread
+            return await asyncio.to_thread(t.execute_sync)
+
+    return await asyncio.gather(
+        *(run_with_limit(t) for t in tasks),
+        return_exceptions=True,
     )
 
-    # declare private attribute to hold the REPL instance
-    _repl: PythonREPL = PrivateAttr()
-
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # bypass Pydantic restriction
-        object.__setattr__(self, "_repl", PythonREPL())
-
-    def _run(self, code: str) -> str:
-        try:
-            result = self._repl.run(code)
-            # If nothing printed, result might be None or empty
-            if result is None:
-                return ""
-            return str(result)
-        except Exception as e:
-            return f"Python REPL error: {e}"
-
-    async def _arun(self, code: str) -> str:
-        return self._run(code)
 
-
-# Instantiate the tools
-repl_tool = PythonREPLCrewTool()
-file_writer_tool = FileWriterTool(directory="./outputs/reports/")
+# The Python REPL tool lives in tools.py (shared via get_repl_tool);
+# only the file writer is built here, lazily for the same reason
+@functools.lru_cache(maxsize=1)
+def _file_writer_tool() -> FileWriterTool:
+    return FileWriterTool(directory="./outputs/reports/")
 
 # ---------------------------
 # Crew Definition
@@ -58,61 +106,91 @@ file_writer_tool = FileWriterTool(directory="./outputs/reports/")
 
 @CrewBase
 class AnalyticsCrew:
+    # Configs are identical for every instance, so they are parsed once
+    # per process and memoized on the class. Deliberately NOT named
+    # agents_config/tasks_config at class scope: @CrewBase captures those
+    # attributes at class-creation time as YAML paths, and anything but a
+    # path string there breaks its wrapped __init__.
+    _agents_config_cache = None
+    _tasks_config_cache = None
+
+    @classmethod
+    def _ensure_loaded(cls):
+        if cls._agents_config_cache is None:
+            cls._agents_config_cache = _load_yaml_cached("config/agents.yaml")
+            cls._tasks_config_cache = _load_yaml_cached("config/tasks.yaml")
+
     def __init__(self):
-        # Load your agent/task configs
-        with open("config/agents.yaml", "r") as f:
-            self.agents_config = yaml.safe_load(f)
-        with open("config/tasks.yaml", "r") as f:
-            self.tasks_config = yaml.safe_load(f)
+        # Load your agent/task configs (parsed once per process); each
+        # instance gets its own copy so mutation can't leak between crews
+        self._ensure_loaded()
+        self.agents_config = copy.deepcopy(self._agents_config_cache)
+        self.tasks_config = copy.deepcopy(self._tasks_config_cache)
+        # Memoized Agent/Task instances: the @agent/@task methods are
+        # called more than once while crew() is assembled, and rebuilding
+        # would hand the crew different objects than the ones wired into
+        # context=[...]
+        self._agent_cache: dict = {}
+        self._task_cache: dict = {}
 
     @agent
     def manager(self) -> Agent:
-        return Agent(
-            role="Project Manager",
-            goal="Efficiently manage the crew and ensure high-quality task completion",
-            backstory="You oversee the workflow, delegate tasks, and ensure consistency.",
-            allow_delegation=True,
-            verbose=True,
-            # max_iter=1,
-            max_execution_time=300,
-        )
+        if "manager" not in self._agent_cache:
+            self._agent_cache["manager"] = Agent(
+                role="Project Manager",
+                goal="Efficiently manage the crew and ensure high-quality task completion",
+                backstory="You oversee the workflow, delegate tasks, and ensure consistency.",
+                allow_delegation=True,
+                verbose=_VERBOSE,
+                # max_iter=1,
+                max_execution_time=300,
+            )
+        return self._agent_cache["manager"]
 
     @agent
     def code_executor(self) -> Agent:
-        return Agent(
-            config=self.agents_config["code_executor"],
-            tools=[repl_tool],
-            verbose=True,
-            # max_retry_limit=1,
-            # max_iter=1,
-        )
+        if "code_executor" not in self._agent_cache:
+            self._agent_cache["code_executor"] = Agent(
+                config=self.agents_config["code_executor"],
+                tools=[get_repl_tool(), get_batch_completion_tool()],
+                verbose=_VERBOSE,
+                # max_retry_limit=1,
+                # max_iter=1,
+            )
+        return self._agent_cache["code_executor"]
 
     @agent
     def report_writer(self) -> Agent:
-        return Agent(
-            config=self.agents_config["report_writer"],
-            tools=[file_writer_tool, repl_tool],
-            verbose=True,
-            # max_retry_limit=1,
-            max_iter=1
-        )
+        if "report_writer" not in self._agent_cache:
+            self._agent_cache["report_writer"] = Agent(
+                config=self.agents_config["report_writer"],
+                tools=[_file_writer_tool(), get_repl_tool()],
+                verbose=_VERBOSE,
+                # max_retry_limit=1,
+                max_iter=1
+            )
+        return self._agent_cache["report_writer"]
 
     @task
     def code_executorTask(self) -> Task:
-        return Task(
-            config=self.tasks_config["code_execution_task"],
-            agent=self.code_executor()
-        )
+        if "code_executorTask" not in self._task_cache:
+            self._task_cache["code_executorTask"] = Task(
+                config=self.tasks_config["code_execution_task"],
+                agent=self.code_executor()
+            )
+        return self._task_cache["code_executorTask"]
 
     @task
     def report_writingTask(self) -> Task:
-        return Task(
-            config=self.tasks_config["report_writing_task"],
-            agent=self.report_writer(),
-            context=[
-                self.code_executorTask()
-            ],
-        )
+        if "report_writingTask" not in self._task_cache:
+            self._task_cache["report_writingTask"] = Task(
+                config=self.tasks_config["report_writing_task"],
+                agent=self.report_writer(),
+                context=[
+                    self.code_executorTask()
+                ],
+            )
+        return self._task_cache["report_writingTask"]
 
     @crew
     def crew(self) -> Crew:
@@ -126,7 +204,7 @@ class AnalyticsCrew:
             tasks=self.tasks,
             process=Process.hierarchical,
             manager_agent=self.manager(),
-            verbose=True,
+            verbose=_VERBOSE,
             memory=False,  # Disable memory to ensure single execution
             max_iter=1,    # Ensure tasks run only once
         )
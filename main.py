@@ -1,9 +1,42 @@
 #!/usr/bin/env python
+import asyncio
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from crew import AnalyticsCrew
 import os
 
 
+def _run_one(data_path):
+    """
+    Run a single crew invocation in a worker process.
+
+    Imported lazily inside the worker so each process builds its own
+    AnalyticsCrew (warm-started by the module-level YAML cache) instead
+    of sharing crew state across processes.
+    """
+    from crew import AnalyticsCrew
+
+    crew = AnalyticsCrew()
+    return crew.crew().kickoff(inputs={'file_path': data_path})
+
+
+def run_many(paths, workers=None):
+    """
+    Fan the crew out over many data files using a process pool.
+
+    Thread pools stall on shared crew state, so each worker process runs
+    its own AnalyticsCrew. Results are yielded as (path, result) in
+    completion order so one slow agent does not block the whole batch.
+    """
+    if workers is None:
+        workers = os.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_run_one, p): p for p in paths}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
 def run():
     """
     Run the crew.
@@ -17,7 +50,8 @@ def run():
     }
     
     crew = AnalyticsCrew()
-    crew.crew().kickoff(inputs=inputs)
+    # Async kickoff lets report writing overlap with other in-flight work
+    asyncio.run(crew.crew().kickoff_async(inputs=inputs))
 
 
 if __name__ == "__main__":
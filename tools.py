@@ -2,16 +2,53 @@
 
 from crewai.tools import BaseTool
 from langchain_experimental.utilities import PythonREPL
-from pydantic import PrivateAttr
+import aiofiles
+import asyncio
+import copy
+import functools
+import io
 import os
+import queue
 import re
 from docx import Document
-from docx.shared import Inches, Pt
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-import markdown2
 from datetime import datetime
 
 
+# ---------------------------
+# Warm REPL pool
+# ---------------------------
+
+# Imports pre-executed in every pooled REPL so analytics code never pays
+# the pandas/numpy/matplotlib cold-import cost inside a tool call
+_REPL_WARMUP_CODE = (
+    "import pandas as pd\n"
+    "import numpy as np\n"
+    "import matplotlib\n"
+    "matplotlib.use('Agg')\n"
+    "import matplotlib.pyplot as plt\n"
+)
+
+_repl_pool: "queue.Queue[PythonREPL]" = queue.Queue()
+
+
+def _get_repl() -> PythonREPL:
+    """Check a warm REPL out of the pool, building one on first demand."""
+    try:
+        return _repl_pool.get_nowait()
+    except queue.Empty:
+        repl = PythonREPL()
+        repl.run(_REPL_WARMUP_CODE)
+        return repl
+
+
+def _put_repl(repl: PythonREPL) -> None:
+    _repl_pool.put(repl)
+
+
 class PythonREPLCrewTool(BaseTool):
     name: str = "python_repl"
     description: str = (
@@ -19,25 +56,155 @@ class PythonREPLCrewTool(BaseTool):
         "Make sure to use print(...) to produce output."
     )
 
-    _repl: PythonREPL = PrivateAttr()
-
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        object.__setattr__(self, "_repl", PythonREPL())
-
     def _run(self, code: str) -> str:
+        repl = _get_repl()
         try:
-            result = self._repl.run(code)
+            result = repl.run(code)
             if result is None:
                 return ""
             return str(result)
         except Exception as e:
             return f"Python REPL error: {e}"
+        finally:
+            # Return the interpreter (and its warm globals) to the pool
+            _put_repl(repl)
 
     async def _arun(self, code: str) -> str:
         return self._run(code)
 
 
+@functools.lru_cache(maxsize=1)
+def get_repl_tool() -> PythonREPLCrewTool:
+    """Shared lazily-built REPL tool instance for the whole process."""
+    return PythonREPLCrewTool()
+
+
+def _llm_max_parallel() -> int:
+    # Read at call time so values loaded from .env count; Ollama users can
+    # steer this with OLLAMA_NUM_PARALLEL instead
+    return int(
+        os.getenv("LLM_MAX_PARALLEL", os.getenv("OLLAMA_NUM_PARALLEL", "4")))
+
+
+async def abatch_completions(prompts, model=None):
+    """
+    Fan a batch of independent prompts out over litellm.acompletion.
+
+    CrewAI drives each agent turn through litellm's blocking completion
+    call, so n independent sub-prompts (e.g. one analysis question per
+    column) cost the sum of their round trips. Gathering async
+    completions overlaps the network I/O, bringing wall time down to
+    roughly the slowest prompt. Concurrency is capped so providers with
+    per-key limits are not flooded.
+    """
+    # litellm ships with crewai; imported here to keep module import light
+    import litellm
+
+    model = model or os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini")
+    semaphore = asyncio.Semaphore(_llm_max_parallel())
+
+    async def one(prompt):
+        async with semaphore:
+            return await litellm.acompletion(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+            )
+
+    return await asyncio.gather(*(one(p) for p in prompts))
+
+
+class BatchCompletionTool(BaseTool):
+    name: str = "batch_llm"
+    description: str = (
+        "Answers several independent questions in a single call. "
+        "Provide a list of prompt strings; answers are returned in the "
+        "same order. Prefer this over asking questions one at a time."
+    )
+
+    @staticmethod
+    def _format(responses) -> str:
+        return "\n\n".join(
+            str(r.choices[0].message.content) for r in responses)
+
+    def _run(self, prompts: list) -> str:
+        try:
+            return self._format(asyncio.run(abatch_completions(prompts)))
+        except Exception as e:
+            return f"Batch completion error: {e}"
+
+    async def _arun(self, prompts: list) -> str:
+        try:
+            return self._format(await abatch_completions(prompts))
+        except Exception as e:
+            return f"Batch completion error: {e}"
+
+
+@functools.lru_cache(maxsize=1)
+def get_batch_completion_tool() -> BatchCompletionTool:
+    """Shared lazily-built batch-completion tool for the whole process."""
+    return BatchCompletionTool()
+
+
+@functools.lru_cache(maxsize=None)
+def _rpr_template(bold: bool, italic: bool, mono: bool, size: int):
+    """Build (once per style combination) the w:rPr element for a run."""
+    rPr = OxmlElement('w:rPr')
+    if mono:
+        fonts = OxmlElement('w:rFonts')
+        fonts.set(qn('w:ascii'), 'Courier New')
+        fonts.set(qn('w:hAnsi'), 'Courier New')
+        rPr.append(fonts)
+    if bold:
+        rPr.append(OxmlElement('w:b'))
+    if italic:
+        rPr.append(OxmlElement('w:i'))
+    if size:
+        sz = OxmlElement('w:sz')
+        sz.set(qn('w:val'), str(size * 2))  # w:sz is in half-points
+        rPr.append(sz)
+    return rPr
+
+
+def _mk_run(p, text: str, bold=False, italic=False, mono=False, size=None):
+    """
+    Append a text run to paragraph p by building the w:r element directly.
+
+    Skips python-docx's add_run + font setters, which rebuild rPr
+    attribute by attribute per run; the constant rPr for each style combo
+    is cached and deep-copied in instead. Newlines become w:br so
+    multi-line (code block) text renders correctly.
+    """
+    r = OxmlElement('w:r')
+    if bold or italic or mono or size:
+        r.append(copy.deepcopy(_rpr_template(bold, italic, mono, size)))
+    for i, chunk in enumerate(text.split('\n')):
+        if i:
+            r.append(OxmlElement('w:br'))
+        t = OxmlElement('w:t')
+        t.set(qn('xml:space'), 'preserve')
+        t.text = chunk
+        r.append(t)
+    p._p.append(r)
+
+
+# Output directories already created this process; lets repeated report
+# generation skip the stat/mkdir syscall pair in os.makedirs
+_dirs_created: set = set()
+
+
+def _ensure_dir(path: str) -> None:
+    if path and path not in _dirs_created:
+        os.makedirs(path, exist_ok=True)
+        _dirs_created.add(path)
+
+
+@functools.lru_cache(maxsize=64)
+def _load_image_bytes(path: str) -> bytes:
+    """Read an image once; reports often reference the same chart repeatedly."""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
 class MarkdownToDocxTool(BaseTool):
     name: str = "markdown_to_docx"
     description: str = (
@@ -46,165 +213,38 @@ class MarkdownToDocxTool(BaseTool):
         "Automatically handles images and formatting."
     )
 
+    # Patterns compiled once at class scope; _run re-matched them per line
+    # before, paying a regex-cache lookup for every line of every document
+    _HEADER = re.compile(r'(#{1,4}) (.*)')
+    _NUM_LIST = re.compile(r'^\d+\.\s')
+    _IMG = re.compile(r'^!\[(.*)\]\((.*)\)$')
+    # Single alternation covering bold/italic/inline-code: one linear pass
+    # per line, with m.lastgroup telling which kind matched. Lookarounds
+    # keep single asterisks from matching the edges of ** pairs.
+    _INLINE = re.compile(
+        r'\*\*(?P<bold>.+?)\*\*'
+        r'|(?<!\*)\*(?!\*)(?P<italic>.+?)\*(?!\*)'
+        r'|`(?P<code>.+?)`'
+    )
+
+    # First characters that can open a non-paragraph construct; anything
+    # else is a plain paragraph and skips the branch cascade entirely
+    _MARKER_CHARS = frozenset('#-*|!`0123456789 ')
+
+    # Measurement constants built once instead of per element: Inches()
+    # constructs an Emu object on every call, and the point sizes feed
+    # straight into _mk_run
+    _IMG_WIDTH = Inches(6)
+    _CODE_SIZE = 9
+    _CAPTION_SIZE = 10
+
     def _run(self, markdown_content: str, output_path: str = None) -> str:
         try:
-            if output_path is None:
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                output_path = f"outputs/reports/data_analysis_report_{timestamp}.docx"
-
-            doc = Document()
-
-            # Add document title
-            doc.add_heading('Data Analysis Report', level=0)
-
-            # Convert markdown to HTML for better parsing
-            html = markdown2.markdown(markdown_content, extras=['tables', 'fenced-code-blocks'])
-
-            # Process the markdown content line by line
-            lines = markdown_content.split('\n')
-            code_block = False
-            code_content = []
-
-            for line in lines:
-                # Handle code blocks
-                if line.startswith('```'):
-                    if not code_block:
-                        code_block = True
-                        code_content = []
-                    else:
-                        code_block = False
-                        # Add the code block
-                        if code_content:
-                            p = doc.add_paragraph()
-                            p.style = 'No Spacing'
-                            run = p.add_run('\n'.join(code_content))
-                            run.font.name = 'Courier New'
-                            run.font.size = Pt(9)
-                    continue
-
-                if code_block:
-                    code_content.append(line)
-                    continue
-
-                # Handle headers
-                if line.startswith('# '):
-                    doc.add_heading(line[2:], level=1)
-                elif line.startswith('## '):
-                    doc.add_heading(line[3:], level=2)
-                elif line.startswith('### '):
-                    doc.add_heading(line[4:], level=3)
-                elif line.startswith('#### '):
-                    doc.add_heading(line[5:], level=4)
-
-                # Handle bullet points
-                elif line.startswith('- ') or line.startswith('* '):
-                    doc.add_paragraph(line[2:], style='List Bullet')
-
-                # Handle numbered lists
-                elif re.match(r'^\d+\.\s', line):
-                    text = re.sub(r'^\d+\.\s', '', line)
-                    doc.add_paragraph(text, style='List Number')
-
-                # Handle images
-                elif re.match(r'^!\[.*\]\(.*\)$', line):
-                    match = re.match(r'^!\[(.*)]\((.*)\)$', line)
-                    if match:
-                        alt_text = match.group(1)
-                        img_path = match.group(2)
-
-                        # Handle relative paths
-                        if img_path.startswith('../charts/'):
-                            img_path = img_path.replace('../charts/', 'outputs/charts/')
-
-                        # Add image to document if it exists
-                        if os.path.exists(img_path):
-                            try:
-                                p = doc.add_paragraph()
-                                p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                                run = p.add_run()
-                                run.add_picture(img_path, width=Inches(6))
-
-                                # Add caption
-                                if alt_text:
-                                    caption = doc.add_paragraph(alt_text)
-                                    caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                                    caption.runs[0].font.size = Pt(10)
-                                    caption.runs[0].italic = True
-                            except Exception as img_error:
-                                doc.add_paragraph(f"[Image: {alt_text} - Could not load: {img_error}]")
-                        else:
-                            doc.add_paragraph(f"[Image: {alt_text} - File not found: {img_path}]")
-
-                # Handle tables (simplified)
-                elif '|' in line and line.strip().startswith('|'):
-                    # This is a simple table handler
-                    cells = [cell.strip() for cell in line.split('|')[1:-1]]
-                    if all(c == '-' or c == '---' for c in ''.join(cells).replace('-', '')):
-                        continue  # Skip separator lines
-                    # For now, just add as formatted text
-                    doc.add_paragraph(line)
-
-                # Handle empty lines
-                elif line.strip() == '':
-                    doc.add_paragraph()
-
-                # Handle regular paragraphs with formatting
-                else:
-                    # Create paragraph
-                    p = doc.add_paragraph()
-
-                    # Handle bold and italic formatting
-                    text = line
-
-                    # Replace bold text
-                    bold_pattern = r'\*\*(.*?)\*\*'
-                    italic_pattern = r'\*(.*?)\*'
-                    code_inline_pattern = r'`(.*?)`'
-
-                    # Process inline formatting
-                    current_pos = 0
-
-                    # Find all formatting matches
-                    all_matches = []
-
-                    for match in re.finditer(bold_pattern, text):
-                        all_matches.append(('bold', match))
-                    for match in re.finditer(italic_pattern, text):
-                        # Check it's not part of bold
-                        if not any(m[1].start() <= match.start() < m[1].end() for m in all_matches if m[0] == 'bold'):
-                            all_matches.append(('italic', match))
-                    for match in re.finditer(code_inline_pattern, text):
-                        all_matches.append(('code', match))
-
-                    # Sort matches by position
-                    all_matches.sort(key=lambda x: x[1].start())
-
-                    # Process text with formatting
-                    if all_matches:
-                        for format_type, match in all_matches:
-                            # Add text before the match
-                            if match.start() > current_pos:
-                                p.add_run(text[current_pos:match.start()])
-
-                            # Add formatted text
-                            if format_type == 'bold':
-                                p.add_run(match.group(1)).bold = True
-                            elif format_type == 'italic':
-                                p.add_run(match.group(1)).italic = True
-                            elif format_type == 'code':
-                                run = p.add_run(match.group(1))
-                                run.font.name = 'Courier New'
-
-                            current_pos = match.end()
-
-                        # Add remaining text
-                        if current_pos < len(text):
-                            p.add_run(text[current_pos:])
-                    else:
-                        p.add_run(text)
+            output_path = self._resolve_output_path(output_path)
+            doc = self._build_doc(markdown_content)
 
             # Ensure output directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            _ensure_dir(os.path.dirname(output_path))
 
             # Save the document
             doc.save(output_path)
@@ -214,5 +254,198 @@ class MarkdownToDocxTool(BaseTool):
         except Exception as e:
             return f"Error converting markdown to DOCX: {e}"
 
+    @staticmethod
+    def _resolve_output_path(output_path):
+        if output_path is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            output_path = f"outputs/reports/data_analysis_report_{timestamp}.docx"
+        return output_path
+
+    def _build_doc(self, markdown_content: str) -> Document:
+        """Build the in-memory Document; saving is left to the caller."""
+        doc = Document()
+
+        # Add document title
+        doc.add_heading('Data Analysis Report', level=0)
+
+        # Nothing to render: skip the whole parse, return the title-only doc
+        if not markdown_content.strip():
+            return doc
+
+        # Process the markdown content line by line (splitlines runs in
+        # C and avoids the trailing empty element split('\n') produces)
+        lines = markdown_content.splitlines()
+        code_block = False
+        code_content = []
+        table_rows = []
+
+        # Pre-scan the charts directory once so the image loop does a
+        # set lookup instead of an os.path.exists syscall per line
+        try:
+            chart_files = {entry.path for entry in os.scandir('outputs/charts/')}
+        except FileNotFoundError:
+            chart_files = set()
+
+        for line in lines:
+            # Flush a pending table once the contiguous |...| block ends
+            if table_rows and not line.lstrip().startswith('|'):
+                self._flush_table(doc, table_rows)
+                table_rows = []
+
+            # Handle code blocks
+            if line.startswith('```'):
+                if not code_block:
+                    code_block = True
+                    code_content = []
+                else:
+                    code_block = False
+                    # Add the code block
+                    if code_content:
+                        p = doc.add_paragraph()
+                        p.style = 'No Spacing'
+                        _mk_run(p, '\n'.join(code_content),
+                                mono=True, size=self._CODE_SIZE)
+                continue
+
+            if code_block:
+                code_content.append(line)
+                continue
+
+            # Fast path: most lines are plain paragraphs, so one
+            # membership test replaces the ~10-branch cascade below
+            if line and line[0] not in self._MARKER_CHARS:
+                self._add_formatted_paragraph(doc, line)
+                continue
+
+            # Handle headers
+            if (match := self._HEADER.match(line)):
+                doc.add_heading(match.group(2), level=len(match.group(1)))
+
+            # Handle bullet points
+            elif line.startswith('- ') or line.startswith('* '):
+                doc.add_paragraph(line[2:], style='List Bullet')
+
+            # Handle numbered lists
+            elif self._NUM_LIST.match(line):
+                text = self._NUM_LIST.sub('', line)
+                doc.add_paragraph(text, style='List Number')
+
+            # Handle images
+            elif (match := self._IMG.match(line)):
+                alt_text = match.group(1)
+                img_path = match.group(2)
+
+                # Handle relative paths
+                if img_path.startswith('../charts/'):
+                    img_path = img_path.replace('../charts/', 'outputs/charts/')
+
+                # Add image to document if it exists
+                if img_path in chart_files or os.path.exists(img_path):
+                    try:
+                        p = doc.add_paragraph()
+                        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                        run = p.add_run()
+                        run.add_picture(
+                            io.BytesIO(_load_image_bytes(img_path)),
+                            width=self._IMG_WIDTH)
+
+                        # Add caption
+                        if alt_text:
+                            caption = doc.add_paragraph()
+                            caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                            _mk_run(caption, alt_text,
+                                    italic=True, size=self._CAPTION_SIZE)
+                    except Exception as img_error:
+                        doc.add_paragraph(f"[Image: {alt_text} - Could not load: {img_error}]")
+                else:
+                    doc.add_paragraph(f"[Image: {alt_text} - File not found: {img_path}]")
+
+            # Handle tables: accumulate the contiguous |...| block and
+            # render it as one Word table instead of a paragraph per row
+            elif '|' in line and line.strip().startswith('|'):
+                table_rows.append(line)
+
+            # Handle empty lines
+            elif line.strip() == '':
+                doc.add_paragraph()
+
+            # Handle regular paragraphs with formatting
+            else:
+                self._add_formatted_paragraph(doc, line)
+
+        # Flush a table that runs to the end of the document
+        if table_rows:
+            self._flush_table(doc, table_rows)
+
+        return doc
+
+    @staticmethod
+    def _is_separator_row(line: str) -> bool:
+        """Return True for a markdown header/body separator row like |---|:--:|."""
+        # The old join/replace check iterated a string with every '-'
+        # removed, so all() was vacuously True and real rows were dropped
+        # as separators; a single-pass set comparison is correct and cheap
+        stripped = line.strip().strip('|').replace(' ', '').replace(':', '')
+        return bool(stripped) and set(stripped) <= {'-', '|'}
+
+    def _flush_table(self, doc, rows) -> None:
+        """Render accumulated markdown table rows as a single Word table."""
+        cell_rows = [
+            [cell.strip() for cell in row.split('|')[1:-1]]
+            for row in rows
+            if not self._is_separator_row(row)
+        ]
+        if not cell_rows:
+            return
+
+        # One table subtree is far cheaper than a paragraph per row
+        table = doc.add_table(rows=len(cell_rows), cols=max(len(r) for r in cell_rows))
+        table.style = 'Light Grid'
+        for i, cells in enumerate(cell_rows):
+            for j, cell_text in enumerate(cells):
+                table.cell(i, j).text = cell_text
+
+    def _add_formatted_paragraph(self, doc, text: str) -> None:
+        """Add a paragraph, rendering inline bold/italic/code as runs."""
+        p = doc.add_paragraph()
+
+        # Single pass over the line; the alternation already yields
+        # matches in order, so no sort or overlap check
+        current_pos = 0
+        for match in self._INLINE.finditer(text):
+            # Add text before the match
+            if match.start() > current_pos:
+                _mk_run(p, text[current_pos:match.start()])
+
+            # Add formatted text
+            if match.lastgroup == 'bold':
+                _mk_run(p, match.group('bold'), bold=True)
+            elif match.lastgroup == 'italic':
+                _mk_run(p, match.group('italic'), italic=True)
+            else:
+                _mk_run(p, match.group('code'), mono=True)
+
+            current_pos = match.end()
+
+        # Add remaining text
+        if current_pos < len(text):
+            _mk_run(p, text[current_pos:])
+
+    def _build_doc_bytes(self, markdown_content: str) -> bytes:
+        buf = io.BytesIO()
+        self._build_doc(markdown_content).save(buf)
+        return buf.getvalue()
+
     async def _arun(self, markdown_content: str, output_path: str = None) -> str:
-        return self._run(markdown_content, output_path)
\ No newline at end of file
+        # Genuinely async: the CPU-bound build runs on a worker thread and
+        # the write goes through aiofiles, so the event loop stays free to
+        # overlap report writing with in-flight LLM calls
+        try:
+            output_path = self._resolve_output_path(output_path)
+            data = await asyncio.to_thread(self._build_doc_bytes, markdown_content)
+            _ensure_dir(os.path.dirname(output_path))
+            async with aiofiles.open(output_path, 'wb') as f:
+                await f.write(data)
+            return f"Successfully converted markdown to DOCX: {output_path}"
+        except Exception as e:
+            return f"Error converting markdown to DOCX: {e}"
\ No newline at end of file